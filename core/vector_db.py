@@ -86,3 +86,44 @@ class VectorDBService:
         except Exception as e:
             logger.error(f"An error occurred during Pinecone search: {e}", exc_info=True)
             return []
+
+    # --- متدهای دسته‌ای برای اسنپ‌شات و بازیابی ---
+    def get_dimension(self) -> int:
+        """ابعاد بردارهای ایندکس را برمی‌گرداند."""
+        stats = self.pinecone_index.describe_index_stats()
+        return int(stats.get('dimension') or 768)
+
+    def list_ids(self, page_size: int = 100):
+        """شناسه‌های تمام رکوردهای ایندکس را صفحه به صفحه برمی‌گرداند."""
+        logger.info(f"Listing record IDs from '{self.index_name}' in pages of {page_size}.")
+        for page in self.pinecone_index.list(limit=page_size):
+            yield list(page)
+
+    def fetch_records(self, ids: list[str]) -> dict[str, dict]:
+        """
+        بردار و متادیتای خام گروهی از رکوردها را با یک درخواست دریافت می‌کند.
+        متادیتا همان‌طور که در Pinecone ذخیره شده (با فیلدهای JSON به صورت رشته) بازگردانده می‌شود.
+        """
+        if not ids:
+            return {}
+        response = self.pinecone_index.fetch(ids=ids)
+        records = {}
+        for record_id, vector in response.vectors.items():
+            records[record_id] = {
+                'values': list(vector.values),
+                'metadata': dict(vector.metadata or {}),
+            }
+        return records
+
+    def upsert_records(self, records: list[dict], batch_size: int = 100) -> int:
+        """
+        رکوردهای آماده (با شناسه، بردار و متادیتای خام) را به صورت دسته‌ای ذخیره می‌کند.
+        تعداد رکوردهای ذخیره‌شده را برمی‌گرداند.
+        """
+        upserted = 0
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            self.pinecone_index.upsert(vectors=batch)
+            upserted += len(batch)
+            logger.info(f"Upserted batch of {len(batch)} records ({upserted}/{len(records)}).")
+        return upserted
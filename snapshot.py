@@ -0,0 +1,204 @@
+import logging
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import load_secrets
+from core.vector_db import VectorDBService
+
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+# ساختار هر پوشه اسنپ‌شات:
+#   vectors.npy     -> آرایه (n, dim) با نوع float32 یا float16، قابل باز کردن با np.load(mmap_mode='r')
+#   records.parquet -> ستون‌های id و metadata (متادیتای خام Pinecone به صورت JSON)؛ ردیف i متناظر با بردار i است
+#   manifest.json   -> اطلاعات اسنپ‌شات؛ آخرین فایلی است که نوشته می‌شود، پس وجودش یعنی اسنپ‌شات کامل است
+VECTORS_FILE = 'vectors.npy'
+RECORDS_FILE = 'records.parquet'
+MANIFEST_FILE = 'manifest.json'
+SUPPORTED_DTYPES = ['float32', 'float16']
+FETCH_BATCH_SIZE = 100
+UPSERT_BATCH_SIZE = 100
+
+
+def load_manifest(snapshot_dir: Path) -> dict:
+    manifest_path = Path(snapshot_dir) / MANIFEST_FILE
+    if not manifest_path.is_file():
+        raise FileNotFoundError(f"'{snapshot_dir}' is not a complete snapshot (missing {MANIFEST_FILE}).")
+    return json.loads(manifest_path.read_text(encoding='utf-8'))
+
+
+def resolve_chain(snapshot_dir: Path) -> list[tuple[Path, dict]]:
+    """زنجیره اسنپ‌شات‌ها را از اسنپ‌شات کامل پایه تا اسنپ‌شات داده‌شده برمی‌گرداند."""
+    chain = []
+    current = Path(snapshot_dir).resolve()
+    while current is not None:
+        if any(current == seen for seen, _ in chain):
+            raise ValueError(f"Snapshot chain has a cycle at '{current}'.")
+        manifest = load_manifest(current)
+        chain.append((current, manifest))
+        base = manifest.get('base')
+        current = (current.parent / base).resolve() if base else None
+    chain.reverse()
+    return chain
+
+
+def live_records(chain: list[tuple[Path, dict]]) -> dict[str, tuple[Path, int]]:
+    """برای هر رکورد زنده در انتهای زنجیره، پوشه اسنپ‌شات و شماره ردیف آن را برمی‌گرداند."""
+    locations = {}
+    for snapshot_dir, manifest in chain:
+        for record_id in manifest.get('deleted_ids', []):
+            locations.pop(record_id, None)
+        ids = pq.read_table(snapshot_dir / RECORDS_FILE, columns=['id']).column('id').to_pylist()
+        for row, record_id in enumerate(ids):
+            locations[record_id] = (snapshot_dir, row)
+    return locations
+
+
+def export_snapshot(db_service: VectorDBService, output_dir: str, base_snapshot: str | None = None,
+                    dtype: str = 'float32') -> dict:
+    """
+    کل ایندکس را در یک پوشه اسنپ‌شات محلی ذخیره می‌کند.
+    اگر base_snapshot داده شود، اسنپ‌شات افزایشی است و فقط رکوردهای جدید و شناسه‌های حذف‌شده را نگه می‌دارد.
+    رکوردها پس از ذخیره تغییر نمی‌کنند (upsert_knowledge همیشه شناسه جدید می‌سازد)، پس مقایسه شناسه‌ها برای ردیابی تغییرات کافی است.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype}'. Use one of {SUPPORTED_DTYPES}.")
+
+    output_path = Path(output_dir).resolve()
+    if (output_path / MANIFEST_FILE).exists():
+        raise FileExistsError(f"A snapshot already exists at '{output_path}'.")
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    known_ids = set()
+    base_reference = None
+    if base_snapshot:
+        base_path = Path(base_snapshot).resolve()
+        known_ids = set(live_records(resolve_chain(base_path)))
+        base_reference = os.path.relpath(base_path, output_path.parent)
+        logger.info(f"Incremental snapshot on top of '{base_path}' ({len(known_ids)} known records).")
+
+    current_ids = []
+    for page in db_service.list_ids(page_size=FETCH_BATCH_SIZE):
+        current_ids.extend(page)
+    current_id_set = set(current_ids)
+    new_ids = [record_id for record_id in current_ids if record_id not in known_ids]
+    deleted_ids = sorted(known_ids - current_id_set)
+    logger.info(f"Index has {len(current_ids)} records: {len(new_ids)} to export, {len(deleted_ids)} deleted since base.")
+
+    dimension = db_service.get_dimension()
+    # np.lib.format.open_memmap یک فایل .npy استاندارد می‌سازد که مستقیم روی دیسک نوشته می‌شود
+    vectors = np.lib.format.open_memmap(
+        output_path / VECTORS_FILE, mode='w+', dtype=dtype, shape=(len(new_ids), dimension)
+    )
+    exported_ids = []
+    exported_metadata = []
+    for start in range(0, len(new_ids), FETCH_BATCH_SIZE):
+        batch_ids = new_ids[start:start + FETCH_BATCH_SIZE]
+        records = db_service.fetch_records(batch_ids)
+        for record_id in batch_ids:
+            record = records.get(record_id)
+            if record is None:
+                # رکورد بین list و fetch حذف شده است
+                logger.warning(f"Record {record_id} disappeared during export. Skipping.")
+                continue
+            vectors[len(exported_ids)] = record['values']
+            exported_ids.append(record_id)
+            exported_metadata.append(json.dumps(record['metadata'], ensure_ascii=False))
+        logger.info(f"Exported {len(exported_ids)}/{len(new_ids)} records.")
+    vectors.flush()
+    del vectors
+
+    if len(exported_ids) < len(new_ids):
+        # حذف ردیف‌های خالی انتهای فایل
+        trimmed = np.load(output_path / VECTORS_FILE)[:len(exported_ids)]
+        np.save(output_path / VECTORS_FILE, trimmed)
+
+    table = pa.table({
+        'id': pa.array(exported_ids, type=pa.string()),
+        'metadata': pa.array(exported_metadata, type=pa.string()),
+    })
+    pq.write_table(table, output_path / RECORDS_FILE)
+
+    manifest = {
+        'index_name': db_service.index_name,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'dimension': dimension,
+        'dtype': dtype,
+        'count': len(exported_ids),
+        'base': base_reference,
+        'deleted_ids': deleted_ids,
+    }
+    (output_path / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    logger.info(f"✅ Snapshot written to '{output_path}' ({len(exported_ids)} records).")
+    return manifest
+
+
+def restore_snapshot(db_service: VectorDBService, snapshot_dir: str, batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """
+    وضعیت نهایی یک اسنپ‌شات (همراه با زنجیره پایه‌های آن) را به صورت دسته‌ای در سرویس برداری مقصد می‌نویسد.
+    شناسه‌های اصلی حفظ می‌شوند، پس اجرای دوباره آن امن است.
+    """
+    chain = resolve_chain(Path(snapshot_dir))
+    locations = live_records(chain)
+    logger.info(f"Restoring {len(locations)} records from a chain of {len(chain)} snapshot(s).")
+
+    restored = 0
+    for part_dir, _ in chain:
+        rows = sorted(row for location_dir, row in locations.values() if location_dir == part_dir)
+        if not rows:
+            continue
+        vectors = np.load(part_dir / VECTORS_FILE, mmap_mode='r')
+        table = pq.read_table(part_dir / RECORDS_FILE)
+        ids = table.column('id').to_pylist()
+        metadata = table.column('metadata').to_pylist()
+        for start in range(0, len(rows), batch_size):
+            batch_rows = rows[start:start + batch_size]
+            batch_vectors = np.asarray(vectors[batch_rows], dtype=np.float32)
+            records = [
+                {'id': ids[row], 'values': values.tolist(), 'metadata': json.loads(metadata[row])}
+                for row, values in zip(batch_rows, batch_vectors)
+            ]
+            restored += db_service.upsert_records(records, batch_size=batch_size)
+        logger.info(f"Restored {restored}/{len(locations)} records.")
+
+    logger.info(f"✅ Restore finished: {restored} records written to '{db_service.index_name}'.")
+    return restored
+
+
+def _init_db_service() -> VectorDBService | None:
+    logger.info("Loading secrets and initializing services...")
+    try:
+        secrets = load_secrets()
+        return VectorDBService(api_key=secrets["PINECONE_API_KEY"], index_name=secrets["PINECONE_INDEX_NAME"])
+    except Exception as e:
+        logger.critical(f"Failed to initialize services. Aborting. Error: {e}", exc_info=True)
+        return None
+
+
+def run_export(output_dir: str, base_snapshot: str | None = None, dtype: str = 'float32'):
+    db_service = _init_db_service()
+    if db_service is None:
+        return
+    try:
+        export_snapshot(db_service, output_dir, base_snapshot=base_snapshot, dtype=dtype)
+    except Exception as e:
+        logger.critical(f"Snapshot export failed: {e}", exc_info=True)
+
+
+def run_restore(snapshot_dir: str):
+    db_service = _init_db_service()
+    if db_service is None:
+        return
+    try:
+        restore_snapshot(db_service, snapshot_dir)
+    except Exception as e:
+        logger.critical(f"Snapshot restore failed: {e}", exc_info=True)